@@ -1,6 +1,10 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+from contextlib import asynccontextmanager
+import base64
+import orjson
 import uvicorn
 import sys
 import os
@@ -8,11 +12,36 @@ import os
 # Add the project root directory to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
-from src.database.db import get_table_names, get_table_schema, execute_sql_query
+from src.database.db import get_table_names, get_all_table_schemas, execute_sql_query, warm_up
 from src.backend.nlp import generate_sql_query, generate_answer
 
-# Initialize FastAPI app
-app = FastAPI(title="SQL Chatbot API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the connection pool and schema cache before serving the first request"""
+    warm_up()
+    yield
+
+def encode_bytes(value):
+    """orjson fallback for BLOB values: UTF-8 text as a string, anything else as base64"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        value = bytes(value)
+        try:
+            return value.decode("utf-8")
+        except UnicodeDecodeError:
+            return base64.b64encode(value).decode("ascii")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class QueryJSONResponse(ORJSONResponse):
+    """ORJSONResponse that also encodes bytes, which SQLite returns for BLOB values"""
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=encode_bytes,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+# Initialize FastAPI app; responses are encoded with orjson rather than the stdlib json
+app = FastAPI(title="SQL Chatbot API", default_response_class=QueryJSONResponse, lifespan=lifespan)
 
 # Define request and response models
 class QueryRequest(BaseModel):
@@ -40,29 +69,28 @@ async def root():
     return {"message": "SQL Chatbot API is running"}
 
 @app.get("/tables", response_model=TableListResponse)
-async def get_tables():
+def get_tables():
     """Get all table names from the database"""
     tables = get_table_names()
     return {"tables": tables}
 
 @app.post("/schema", response_model=SchemaResponse)
-async def get_schema(request: SchemaRequest):
+def get_schema(request: SchemaRequest):
     """Get schema for a specific table or all tables"""
+    # Both cases are served from the cached schemas, without reflecting per request
+    full_schema = get_all_table_schemas()
     if request.table_name:
-        schema = get_table_schema(request.table_name)
+        schema = full_schema.get(request.table_name)
         if not schema:
             raise HTTPException(status_code=404, detail=f"Table {request.table_name} not found")
         return {"schema": {request.table_name: schema}}
     else:
-        # Get all table schemas
-        tables = get_table_names()
-        full_schema = {}
-        for table in tables:
-            full_schema[table] = get_table_schema(table)
         return {"schema": full_schema}
 
-@app.post("/query", response_model=QueryResponse)
-async def process_query(request: QueryRequest):
+# Responses are returned as QueryJSONResponse, skipping a Pydantic validation pass over every
+# result row; QueryResponse still documents the response shape
+@app.post("/query", response_model=None, responses={200: {"model": QueryResponse}})
+def process_query(request: QueryRequest) -> QueryJSONResponse:
     """Process natural language query and return SQL results with explanation"""
     if not request.question:
         raise HTTPException(status_code=400, detail="Question cannot be empty")
@@ -71,20 +99,20 @@ async def process_query(request: QueryRequest):
     sql_result = generate_sql_query(request.question)
     
     if not sql_result["success"]:
-        return {
+        return QueryJSONResponse({
             "success": False,
             "error": sql_result["error"]
-        }
+        })
     
     # Execute the generated SQL
     query_result = execute_sql_query(sql_result["sql"])
     
     if not query_result["success"]:
-        return {
+        return QueryJSONResponse({
             "success": False,
             "sql": sql_result["sql"],
             "error": query_result["error"]
-        }
+        })
     
     # Generate a natural language explanation of the results
     explanation_result = generate_answer(
@@ -104,7 +132,7 @@ async def process_query(request: QueryRequest):
     if explanation_result["success"]:
         response["explanation"] = explanation_result["explanation"]
     
-    return response
+    return QueryJSONResponse(response)
 
 # Run the API with Uvicorn when the script is executed directly
 if __name__ == "__main__":
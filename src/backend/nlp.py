@@ -1,7 +1,13 @@
 import os
+import re
 import sys
 import json
+import time
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from langchain.chains import LLMChain
 from langchain_openai import ChatOpenAI
 from langchain.prompts.chat import (
@@ -23,7 +29,50 @@ logger = logging.getLogger(__name__)
 # do not change this unless explicitly requested by the user
 MODEL_NAME = "gpt-4o"
 
-# Initialize the LLM
+# Generated SQL is reused for repeated questions against an unchanged schema
+SQL_CACHE_TTL = 3600
+SQL_CACHE_MAX_ENTRIES = 1024
+
+_sql_cache = OrderedDict()
+_sql_cache_lock = threading.Lock()
+
+def normalize_question(question):
+    """Collapse whitespace and drop trailing punctuation so trivially different spellings share a cache entry
+    
+    Case and inner punctuation are kept: they can change the meaning of a
+    filter ("< 5000" vs "> 5000") or a string literal in the generated SQL.
+    """
+    return re.sub(r"\s+", " ", question).strip().rstrip("?.! ")
+
+def sql_cache_key(question, schema):
+    """Key a question by its normalized text and the schema it was answered against"""
+    payload = f"{schema}\0{normalize_question(question)}".encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+def get_cached_sql(key):
+    """Return cached SQL for a key, or None when missing or expired"""
+    with _sql_cache_lock:
+        entry = _sql_cache.get(key)
+        if entry is None:
+            return None
+        sql, stored_at = entry
+        if time.monotonic() - stored_at >= SQL_CACHE_TTL:
+            del _sql_cache[key]
+            return None
+        _sql_cache.move_to_end(key)
+        return sql
+
+def cache_sql(key, sql):
+    """Store generated SQL, evicting the least recently used entries past SQL_CACHE_MAX_ENTRIES"""
+    with _sql_cache_lock:
+        _sql_cache[key] = (sql, time.monotonic())
+        _sql_cache.move_to_end(key)
+        while len(_sql_cache) > SQL_CACHE_MAX_ENTRIES:
+            _sql_cache.popitem(last=False)
+
+# Initialize the LLM once; the client is stateless between calls, so every
+# question shares it instead of repeating its validation and HTTP client setup
+@lru_cache(maxsize=1)
 def get_llm():
     """Initialize and return the language model"""
     api_key = os.environ.get("OPENAI_API_KEY")
@@ -37,6 +86,10 @@ def get_llm():
         api_key=api_key
     )
 
+# The formatted schema is rebuilt only when get_all_table_schemas() hands back a
+# different dict, i.e. after its TTL expires or the schema cache is invalidated
+_schema_string_cache = {"entry": (None, None)}
+
 def get_table_schema_string():
     """Get database schema as a formatted string for the LLM prompt"""
     schema_dict = get_all_table_schemas()
@@ -44,6 +97,10 @@ def get_table_schema_string():
     if not schema_dict:
         return "No tables found in the database."
     
+    cached_schemas, cached_str = _schema_string_cache["entry"]
+    if cached_schemas is schema_dict:
+        return cached_str
+    
     schema_str = "Database Schema:\n"
     
     for table_name, columns in schema_dict.items():
@@ -55,17 +112,11 @@ def get_table_schema_string():
         
         schema_str += "\n"
     
+    _schema_string_cache["entry"] = (schema_dict, schema_str)
     return schema_str
 
-def setup_sql_chain():
-    """Set up the LangChain chain for SQL generation"""
-    llm = get_llm()
-    
-    # Get database schema
-    schema_str = get_table_schema_string()
-    
-    # Define the system prompt with the database schema
-    system_template = """You are an expert SQL assistant that translates natural language questions into SQL queries.
+# Define the system prompt; the schema is filled in when the chain is invoked
+SQL_SYSTEM_TEMPLATE = """You are an expert SQL assistant that translates natural language questions into SQL queries.
     
 {schema}
 
@@ -81,22 +132,22 @@ Your task is to generate a valid SQLite SQL query based on the user's question.
 - The generated SQL should be directly executable without modification
 - Make sure to follow SQLite syntax (not PostgreSQL)
 """
-    
-    # Create the chat prompt template
-    system_message_prompt = SystemMessagePromptTemplate.from_template(system_template)
-    human_template = "{question}"
-    human_message_prompt = HumanMessagePromptTemplate.from_template(human_template)
-    
-    chat_prompt = ChatPromptTemplate.from_messages([
-        system_message_prompt,
-        human_message_prompt
-    ])
-    
-    # Create the chain
+
+# The chat prompt template is built once at import rather than per question
+SQL_CHAT_PROMPT = ChatPromptTemplate.from_messages([
+    SystemMessagePromptTemplate.from_template(SQL_SYSTEM_TEMPLATE),
+    HumanMessagePromptTemplate.from_template("{question}")
+])
+
+@lru_cache(maxsize=1)
+def setup_sql_chain():
+    """Set up the LangChain chain for SQL generation"""
+    # Create the chain; verbose output would print the whole prompt, schema included,
+    # to stdout on every question
     chain = LLMChain(
-        llm=llm,
-        prompt=chat_prompt,
-        verbose=True
+        llm=get_llm(),
+        prompt=SQL_CHAT_PROMPT,
+        verbose=False
     )
     
     return chain
@@ -165,7 +216,6 @@ def generate_answer(question, sql_query, query_results):
 def generate_sql_query(user_question):
     """Generate SQL from natural language question"""
     try:
-        chain = setup_sql_chain()
         schema = get_table_schema_string()
         
         if "No tables found" in schema:
@@ -174,6 +224,18 @@ def generate_sql_query(user_question):
                 "error": "No database tables found. Please ensure your database is properly configured and contains data."
             }
         
+        # The schema is part of the key, so a schema change never reuses stale SQL
+        cache_key = sql_cache_key(user_question, schema)
+        cached_sql = get_cached_sql(cache_key)
+        if cached_sql is not None:
+            logger.info("Reusing cached SQL for question")
+            return {
+                "success": True,
+                "sql": cached_sql
+            }
+        
+        chain = setup_sql_chain()
+        
         # Generate SQL query
         result = chain.invoke({"schema": schema, "question": user_question})
         generated_sql = result["text"].strip()
@@ -199,7 +261,9 @@ def generate_sql_query(user_question):
         # Check if it's a valid SQL query by looking for SQL keywords at the beginning
         # Common SQL query beginnings
         sql_keywords = ["select", "with", "insert", "update", "delete", "create", "alter", "drop", "explain"]
-        first_word = generated_sql.split()[0].lower() if generated_sql.split() else ""
+        # Split off only the first word rather than tokenizing the whole query (twice)
+        words = generated_sql.split(None, 1)
+        first_word = words[0].lower() if words else ""
         
         # If the response doesn't start with a SQL keyword, it's probably an explanation
         if first_word not in sql_keywords or generated_sql.startswith("To"):
@@ -227,6 +291,9 @@ def generate_sql_query(user_question):
                 "error": friendly_message
             }
         
+        logger.debug("Generated SQL: %s", generated_sql)
+        cache_sql(cache_key, generated_sql)
+        
         return {
             "success": True, 
             "sql": generated_sql
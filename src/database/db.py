@@ -1,7 +1,13 @@
 import os
+import json
+import hashlib
 import logging
+import re
 import sys
-from sqlalchemy import create_engine, inspect, text
+import threading
+import time
+from functools import lru_cache
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.exc import SQLAlchemyError
 
 # Add the project root directory to the Python path
@@ -13,60 +19,208 @@ from src.utils.db_init import initialize_database
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Initialize the database before connecting
-initialize_database()
-
-# Create a SQLite database connection
+# SQLite database connection
 db_url = "sqlite:///sql_chatbot.db"
 
-try:
-    engine = create_engine(db_url)
-    logger.info(f"Successfully connected to SQLite database at sql_chatbot.db")
-except Exception as e:
-    logger.error(f"Error creating database engine: {e}")
-    raise
+# Read-only connection for queries that only read, so they can never take the write lock
+read_only_db_url = "sqlite:///file:sql_chatbot.db?mode=ro&uri=true"
+
+# PRAGMAs applied to every new SQLite connection; the journal settings are only
+# valid on the writable engine (WAL mode persists in the file, so readers use it too)
+SQLITE_PRAGMAS = ("temp_store=MEMORY", "cache_size=-65536", "mmap_size=268435456", "busy_timeout=5000")
+SQLITE_WRITER_PRAGMAS = ("journal_mode=WAL", "synchronous=NORMAL")
+
+# File-backed SQLite engines already get a QueuePool; it is sized here so concurrent
+# API requests reuse open connections instead of overflowing into throwaway ones
+SQLITE_POOL_OPTIONS = {"pool_size": 10, "max_overflow": 20}
+
+def apply_pragmas(dbapi_connection, pragmas):
+    """Run each PRAGMA on a raw DBAPI connection"""
+    cursor = dbapi_connection.cursor()
+    for pragma in pragmas:
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+def tune_connection(dbapi_connection, connection_record):
+    """Switch the database to WAL and tune each new read-write connection"""
+    apply_pragmas(dbapi_connection, SQLITE_WRITER_PRAGMAS + SQLITE_PRAGMAS)
+
+def tune_read_only_connection(dbapi_connection, connection_record):
+    """Tune each new read-only connection"""
+    apply_pragmas(dbapi_connection, SQLITE_PRAGMAS)
+
+# Engines are created on first use, so importing this module does no I/O
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_engine(read_only=False):
+    """Get the read-write (or read-only) engine, initializing the database on first use"""
+    with _engines_lock:
+        if not _engines:
+            # Initialize the database before connecting
+            initialize_database()
+            
+            try:
+                engine = create_engine(db_url, **SQLITE_POOL_OPTIONS)
+                read_only_engine = create_engine(read_only_db_url, **SQLITE_POOL_OPTIONS)
+                event.listen(engine, "connect", tune_connection)
+                event.listen(read_only_engine, "connect", tune_read_only_connection)
+                logger.info(f"Successfully connected to SQLite database at sql_chatbot.db")
+            except Exception as e:
+                logger.error(f"Error creating database engine: {e}")
+                raise
+            
+            _engines["read_write"] = engine
+            _engines["read_only"] = read_only_engine
+    
+    return _engines["read_only" if read_only else "read_write"]
 
 def get_table_names():
-    """Get all table names from the database"""
-    try:
-        inspector = inspect(engine)
-        return inspector.get_table_names()
-    except SQLAlchemyError as e:
-        logger.error(f"Error getting table names: {e}")
-        return []
+    """Get all table names from the database
+    
+    Served from the cached schemas, so checking for a table doesn't query
+    sqlite_master each time.
+    """
+    return list(get_all_table_schemas())
 
 def get_table_schema(table_name):
-    """Get schema for a specific table"""
+    """Get schema for a specific table
+    
+    Served from the cached schemas like get_table_names(), rather than
+    reflecting the one table again; an unknown table gives an empty dict.
+    """
+    return dict(get_all_table_schemas().get(table_name, {}))
+
+# Reflected schemas are reused for this many seconds before being read again
+SCHEMA_CACHE_TTL = 300
+
+# Statements that change the schema and so invalidate the cache
+DDL_PATTERN = re.compile(r"^\s*(create|alter|drop)\b", re.IGNORECASE)
+
+# Statements run on the read-only engine
+READ_ONLY_PATTERN = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+
+# Reflected schemas are also kept on disk, tagged with a fingerprint of the schema,
+# so a restart against an unchanged database skips reflection
+SCHEMA_CACHE_FILE = ".schema_cache.json"
+
+_schema_cache = {"schemas": None, "loaded_at": 0.0}
+_schema_cache_lock = threading.Lock()
+
+def get_schema_fingerprint():
+    """Hash the schema definitions in sqlite_master
+    
+    Unlike PRAGMA schema_version, a small counter that unrelated databases can
+    share, this only matches when the stored schema itself is the same.
+    """
+    with get_engine().connect() as connection:
+        rows = connection.execute(text("SELECT type, name, sql FROM sqlite_master ORDER BY type, name")).all()
+    return hashlib.blake2b(json.dumps([list(row) for row in rows]).encode(), digest_size=16).hexdigest()
+
+def load_schema_cache_file(schema_fingerprint):
+    """Load schemas saved on disk, or None when missing, unreadable or saved for another schema"""
     try:
-        inspector = inspect(engine)
-        columns = inspector.get_columns(table_name)
-        return {column['name']: column['type'].__str__() for column in columns}
-    except SQLAlchemyError as e:
-        logger.error(f"Error getting schema for table {table_name}: {e}")
-        return {}
+        with open(SCHEMA_CACHE_FILE) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if cached.get("db_url") != db_url or cached.get("schema_fingerprint") != schema_fingerprint:
+        return None
+    return cached.get("schemas")
+
+def save_schema_cache_file(schema_fingerprint, schemas):
+    """Save reflected schemas to disk for the next process to reuse
+    
+    The file is written whole to a temporary name and renamed into place, so a
+    concurrent reader never sees a truncated or half-written file.
+    """
+    data = json.dumps({"db_url": db_url, "schema_fingerprint": schema_fingerprint, "schemas": schemas}).encode()
+    tmp_path = f"{SCHEMA_CACHE_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, SCHEMA_CACHE_FILE)
+    except OSError as e:
+        logger.warning(f"Could not write schema cache file: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+def invalidate_schema_cache():
+    """Drop the cached schemas so the next lookup reflects the database again"""
+    with _schema_cache_lock:
+        _schema_cache["schemas"] = None
 
 def get_all_table_schemas():
-    """Get schemas for all tables in the database"""
+    """Get schemas for all tables in the database
+    
+    The result is cached for SCHEMA_CACHE_TTL seconds and shared between
+    callers, so it must not be modified.
+    """
+    with _schema_cache_lock:
+        schemas = _schema_cache["schemas"]
+        if schemas is not None and time.monotonic() - _schema_cache["loaded_at"] < SCHEMA_CACHE_TTL:
+            return schemas
+    
     try:
-        table_schemas = {}
-        tables = get_table_names()
-        
-        for table in tables:
-            table_schemas[table] = get_table_schema(table)
+        schema_fingerprint = get_schema_fingerprint()
+        table_schemas = load_schema_cache_file(schema_fingerprint)
         
-        return table_schemas
+        if table_schemas is None:
+            # Reflect every table's columns in one inspector pass instead of one lookup per table
+            inspector = inspect(get_engine())
+            columns_by_table = inspector.get_multi_columns()
+            
+            # Keys are (schema, table) pairs; sort by table name like Inspector.get_table_names()
+            table_schemas = {
+                table: {column['name']: column['type'].__str__() for column in columns}
+                for (_, table), columns in sorted(columns_by_table.items(), key=lambda item: item[0][1])
+            }
+            if table_schemas:
+                save_schema_cache_file(schema_fingerprint, table_schemas)
     except Exception as e:
         logger.error(f"Error getting all table schemas: {e}")
         return {}
+    
+    # An empty result (no tables yet) is not cached
+    if table_schemas:
+        with _schema_cache_lock:
+            _schema_cache["schemas"] = table_schemas
+            _schema_cache["loaded_at"] = time.monotonic()
+    
+    return table_schemas
+
+def warm_up():
+    """Open a pooled connection on each engine and load the schema cache so the first request pays for neither"""
+    try:
+        for pooled_engine in (get_engine(), get_engine(read_only=True)):
+            with pooled_engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+    except SQLAlchemyError as e:
+        logger.error(f"Error warming up database connection: {e}")
+    get_all_table_schemas()
+
+# Repeated SQL (e.g. served from the question cache) reuses its parsed TextClause
+@lru_cache(maxsize=256)
+def cached_text(query):
+    """Return a TextClause for query, reusing the one already built for the same string"""
+    return text(query)
 
 def execute_sql_query(query):
     """Execute SQL query and return results"""
     try:
-        with engine.connect() as connection:
-            result = connection.execute(text(query))
+        query_engine = get_engine(read_only=bool(READ_ONLY_PATTERN.match(query)))
+        with query_engine.connect() as connection:
+            result = connection.execute(cached_text(query))
             # Convert row objects to dictionaries
-            rows = [dict(row._mapping) for row in result]
+            rows = [dict(row) for row in result.mappings()]
             return {"success": True, "data": rows}
     except Exception as e:
         logger.error(f"Error executing SQL query: {e}")
-        return {"success": False, "error": str(e)}
\ No newline at end of file
+        return {"success": False, "error": str(e)}
+    finally:
+        # DDL returns no rows and so reports an error above, but it has still run
+        if DDL_PATTERN.match(query):
+            invalidate_schema_cache()
\ No newline at end of file
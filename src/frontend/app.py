@@ -1,15 +1,24 @@
 import streamlit as st
 import pandas as pd
 import requests
-import json
-import traceback
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import hashlib
+import logging
 import sys
 import os
-from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Any, Tuple
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
 # Set page configuration
 st.set_page_config(
     page_title="SQL Chatbot",
@@ -20,47 +29,119 @@ st.set_page_config(
 # Backend API URL - using 127.0.0.1 instead of localhost to avoid DNS issues
 BACKEND_URL = "http://127.0.0.1:8000"
 
+# Limits on how much of a result set is shipped to the browser
+MAX_DISPLAY_ROWS = 1000
+MAX_CHART_POINTS = 5000
+
+# Chat history limits: entries kept per session, and most recent entries rendered in full
+MAX_CHAT_HISTORY = 50
+FULL_RENDER_ENTRIES = 10
+
+# Scatter plots above this many points are drawn with WebGL instead of SVG
+WEBGL_MIN_POINTS = 1000
+
+# Plotly client config: the charts here don't use the pan/zoom mode bar
+PLOTLY_CONFIG = {"displayModeBar": False}
+
+# (connect, read) timeouts in seconds - fail fast when the backend is down
+REQUEST_TIMEOUT = (3, 10)
+
+# Shared HTTP session so backend calls reuse keep-alive connections
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Create a pooled requests session for talking to the backend"""
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries))
+    return session
+
+# Function to send a raw request to the backend API (safe to call from worker threads)
+def send_request(session: requests.Session, endpoint: str, data: Dict = None, method: str = "GET") -> requests.Response:
+    """Send a request to the backend API without touching the Streamlit UI"""
+    if method == "GET":
+        return session.get(f"{BACKEND_URL}/{endpoint}", timeout=REQUEST_TIMEOUT)
+    
+    if data is None:
+        data = {}  # Ensure data is at least an empty dict for POST requests
+    return session.post(
+        f"{BACKEND_URL}/{endpoint}",
+        data=orjson.dumps(data),
+        headers={"Content-Type": "application/json"},
+        timeout=REQUEST_TIMEOUT
+    )
+
 # Function to fetch data from the backend API
 def query_backend(endpoint: str, data: Dict = None, method: str = "GET") -> Dict:
     """Make a request to the backend API"""
     try:
-        # Add debugging information
-        st.sidebar.info(f"Connecting to: {BACKEND_URL}/{endpoint}")
-        
-        if method == "GET":
-            response = requests.get(f"{BACKEND_URL}/{endpoint}", timeout=10)
-        else:  # POST
-            if data is None:
-                data = {}  # Ensure data is at least an empty dict for POST requests
-            response = requests.post(f"{BACKEND_URL}/{endpoint}", json=data, timeout=10)
-        
-        # Log the response status
-        st.sidebar.success(f"Response status: {response.status_code}")
-        
+        response = send_request(get_session(), endpoint, data, method)
         response.raise_for_status()  # Raise exception for HTTP errors
-        return response.json()
+        return orjson.loads(response.content)
     except Exception as e:
+        # Retries have already been exhausted by the session's adapter here;
+        # the traceback goes to the log, not the page
+        logger.exception("Backend request to /%s failed", endpoint)
         st.error(f"Error connecting to backend: {str(e)}")
         st.sidebar.error(f"Backend error details: {type(e).__name__}: {str(e)}")
-        st.sidebar.error(f"Traceback: {traceback.format_exc()}")
         return {"success": False, "error": str(e)}
 
+# Cached reader for database metadata, shared across sessions; only the sidebar's
+# refresh button clears it
+@st.cache_data(ttl=300, show_spinner=False)
+def get_database_info() -> Dict:
+    """Fetch the table list and the full schema from the backend concurrently"""
+    session = get_session()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        tables_future = executor.submit(send_request, session, "tables")
+        schema_future = executor.submit(send_request, session, "schema", {}, "POST")
+        tables_response = tables_future.result()
+        schema_response = schema_future.result()
+    
+    # Errors propagate to the caller, so failed lookups are never cached
+    tables_response.raise_for_status()
+    schema_response.raise_for_status()
+    return {
+        "tables": orjson.loads(tables_response.content).get("tables", []),
+        "schema": orjson.loads(schema_response.content).get("schema", {})
+    }
+
+# Function to classify (column, dtype) pairs, memoized on the column fingerprint
+@lru_cache(maxsize=128)
+def classify_dtypes(dtype_items: Tuple) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Split (column, dtype) pairs into numeric and categorical column names"""
+    num_columns, cat_columns = [], []
+    for col, dtype in dtype_items:
+        # Booleans are not plotted as numbers (matches select_dtypes 'number')
+        if pd.api.types.is_bool_dtype(dtype):
+            continue
+        if pd.api.types.is_numeric_dtype(dtype):
+            num_columns.append(col)
+        elif dtype == object or isinstance(dtype, (pd.StringDtype, pd.CategoricalDtype)):
+            cat_columns.append(col)
+    return tuple(num_columns), tuple(cat_columns)
+
+# Function to split dataframe columns by data type
+def split_columns(df: pd.DataFrame) -> Tuple[List[str], List[str]]:
+    """Split dataframe columns into numeric and categorical lists"""
+    num_columns, cat_columns = classify_dtypes(tuple(df.dtypes.items()))
+    return list(num_columns), list(cat_columns)
+
+# Function to bound the number of distinct values in a column
+def few_distinct(series: pd.Series, limit: int) -> bool:
+    """Check that a column has at most limit distinct values, skipping the hash when it has no more rows than that"""
+    return len(series) <= limit or series.nunique() <= limit
+
 # Function to detect data types suitable for visualization
-def detect_chart_type(df: pd.DataFrame) -> str:
-    """Detect suitable chart type based on dataframe content"""
+def detect_chart_type(df: pd.DataFrame, num_columns: List[str], cat_columns: List[str]) -> str:
+    """Detect suitable chart type based on dataframe content and its column types"""
     # No data or too little data
     if df.empty or len(df) < 2:
         return "none"
     
-    # Count number of columns by data type
-    num_columns = df.select_dtypes(include=['number']).columns
-    cat_columns = df.select_dtypes(include=['object', 'string', 'category']).columns
-    date_columns = df.select_dtypes(include=['datetime']).columns
-    
     # If we have exactly one category column and one numeric column, bar chart is good
     if len(cat_columns) == 1 and len(num_columns) == 1:
         # If category has few unique values, bar chart is suitable
-        if df[cat_columns[0]].nunique() <= 15:
+        if few_distinct(df[cat_columns[0]], 15):
             return "bar"
     
     # If we have multiple numeric columns, line chart might be good
@@ -69,7 +150,7 @@ def detect_chart_type(df: pd.DataFrame) -> str:
     
     # If we have one category and multiple numerics, grouped bar might be good
     if len(cat_columns) == 1 and len(num_columns) >= 2:
-        if df[cat_columns[0]].nunique() <= 10:
+        if few_distinct(df[cat_columns[0]], 10):
             return "grouped_bar"
     
     # If we have two numeric columns, scatter plot might be suitable
@@ -83,200 +164,256 @@ def detect_chart_type(df: pd.DataFrame) -> str:
     # Default to no recommended chart
     return "none"
 
-# Function to display query results
-def display_results(results: Dict[str, Any]) -> None:
-    """Display query results in Streamlit"""
-    if not results.get("success", False):
-        st.error(f"Error: {results.get('error', 'Unknown error')}")
+# Function to get the DataFrame for a query result or chat entry
+def results_to_df(entry: Dict[str, Any]) -> pd.DataFrame:
+    """Return the result DataFrame stored on an entry, building it from its rows on first use"""
+    if "df" not in entry:
+        rows = entry.get("data") or []
+        # Every row has the same keys, so take the columns from the first one
+        # rather than letting pandas union the keys of every row
+        entry["df"] = pd.DataFrame.from_records(rows, columns=list(rows[0]) if rows else None)
+    return entry["df"]
+
+# Function to give a chat entry a stable id for its widget keys
+def entry_id(question: str, sql: str) -> str:
+    """Hash the question, SQL and a per-session counter into a short id
+    
+    Widget keys built from the id survive history trimming, unlike keys built
+    from list positions. The counter keeps a repeated question distinct.
+    """
+    st.session_state.entry_count += 1
+    payload = orjson.dumps([st.session_state.entry_count, question, sql])
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+# Function to keep the chat history bounded
+def trim_chat_history() -> None:
+    """Drop the oldest chat entries past MAX_CHAT_HISTORY"""
+    history = st.session_state.chat_history
+    if len(history) <= MAX_CHAT_HISTORY:
         return
     
-    # Display the explanation if available
-    explanation = results.get("explanation")
-    if explanation:
-        st.info(explanation)
+    del history[:-MAX_CHAT_HISTORY]
+
+# Function to convert text columns that hold dates or numbers
+def coerce_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a DataFrame with date-like and numeric-like text columns converted"""
+    converted = {}
+    for col, dtype in df.dtypes.items():
+        if dtype != object:
+            continue
+        
+        # Try to parse as datetime first, then fall back to numbers
+        try:
+            parsed = pd.to_datetime(df[col])
+            if parsed.dtype != object:
+                converted[col] = parsed
+                continue
+        except (ValueError, TypeError):
+            pass
+        try:
+            converted[col] = pd.to_numeric(df[col])
+        except (ValueError, TypeError):
+            pass
+    
+    # Leave the (cached) input frame untouched
+    return df.assign(**converted) if converted else df
+
+# Function to export a result set for download
+@st.cache_data(show_spinner=False)
+def to_csv(df: pd.DataFrame) -> bytes:
+    """Serialize a DataFrame to CSV bytes"""
+    return df.to_csv(index=False).encode("utf-8")
+
+# Function to display a result table
+def render_table(df: pd.DataFrame, key: str) -> None:
+    """Show a result table, truncated to MAX_DISPLAY_ROWS with a CSV download for the rest"""
+    total_rows = len(df)
+    if total_rows > MAX_DISPLAY_ROWS:
+        st.dataframe(df.head(MAX_DISPLAY_ROWS), use_container_width=True, hide_index=True)
+        st.caption(f"Showing {MAX_DISPLAY_ROWS} of {total_rows} rows")
+        st.download_button(
+            "Download all rows (CSV)",
+            to_csv(df),
+            file_name="query_results.csv",
+            mime="text/csv",
+            key=f"download_{key}"
+        )
+    else:
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        st.caption(f"Found {total_rows} {'row' if total_rows == 1 else 'rows'}")
+
+# Function to thin out data for point-based charts
+def downsample(df: pd.DataFrame) -> pd.DataFrame:
+    """Return at most MAX_CHART_POINTS evenly spaced rows for line and scatter charts"""
+    if len(df) <= MAX_CHART_POINTS:
+        return df
+    step = -(-len(df) // MAX_CHART_POINTS)  # ceiling division
+    return df.iloc[::step]
+
+# Function to get plot-ready values for a column
+def plot_values(series: pd.Series, downcast: bool = False):
+    """Return a column as an array, optionally downcasting numbers to float32
     
-    # Display the SQL query
-    with st.expander("Generated SQL Query", expanded=True):
-        st.code(results.get("sql", ""), language="sql")
+    float32 halves the payload of large point charts but is only exact up to
+    2**24, so small charts keep full precision for their hover values.
+    """
+    if downcast and pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy(dtype="float32", na_value=float("nan"))
+    return series.to_numpy()
+
+# Function to build Plotly figures, cached on the chart inputs
+@st.cache_data(show_spinner=False, max_entries=128)
+def build_figure(df: pd.DataFrame, kind: str, x: str, y: str = None) -> Dict:
+    """Build a Plotly figure dict for a scatter or histogram chart
     
-    # Display the data results
-    data = results.get("data", [])
-    if data:
-        st.subheader("Query Results")
-        
-        # Convert to DataFrame for better display
-        df = pd.DataFrame(data)
-        
-        # Show data table with styling
-        with st.expander("Data Table", expanded=True):
-            st.dataframe(
-                df,
-                use_container_width=True,
-                hide_index=True
-            )
-            st.caption(f"Found {len(data)} {'row' if len(data) == 1 else 'rows'}")
-        
-        # Visualization section
-        st.subheader("Visualizations")
-        
-        # Try to detect suitable chart type
-        chart_type = detect_chart_type(df)
-        
-        # Convert any date-like strings to datetime
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                try:
-                    # Try to parse as datetime
-                    df[col] = pd.to_datetime(df[col])
-                except:
-                    pass
-        
-        # Convert numeric columns if they're stored as strings
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                try:
-                    df[col] = pd.to_numeric(df[col])
-                except:
-                    pass
-        
-        # Get numeric and categorical columns after conversion
-        num_columns = df.select_dtypes(include=['number']).columns.tolist()
-        cat_columns = df.select_dtypes(include=['object', 'string', 'category']).columns.tolist()
+    Callers pass only the plotted columns, so the cache key hashes (and the
+    cached value stores) just those instead of the whole result set.
+    """
+    if kind == "scatter":
+        large = len(df) > WEBGL_MIN_POINTS
+        return {
+            "data": [{
+                "type": "scattergl" if large else "scatter",
+                "x": plot_values(df[x], downcast=large),
+                "y": plot_values(df[y], downcast=large),
+            }],
+            "layout": {"title": f"{y} vs {x}", "xaxis": {"title": x}, "yaxis": {"title": y}}
+        }
+    
+    if kind == "histogram":
+        trace = {"type": "histogram", "x": plot_values(df[x])}
+        return {"data": [trace], "layout": {"title": f"Distribution of {x}"}}
+    
+    raise ValueError(f"Unsupported chart kind: {kind}")
+
+# Function to index chart columns by a category column
+def indexed(df: pd.DataFrame, index_col: str, columns):
+    """Return columns indexed by index_col, like df.set_index(index_col)[columns]
+    
+    Built straight from the column arrays, so the rest of the frame is never
+    copied. A single column name gives a Series, a list gives a DataFrame.
+    """
+    index = pd.Index(df[index_col].values, name=index_col)
+    if isinstance(columns, str):
+        return pd.Series(df[columns].values, index=index, name=columns)
+    return pd.DataFrame({col: df[col].values for col in columns}, index=index)
+
+# Function to render a Plotly figure
+def show_figure(fig: Dict) -> None:
+    """Render a Plotly figure without the mode bar or Streamlit theme post-processing"""
+    st.plotly_chart(fig, use_container_width=True, theme=None, config=PLOTLY_CONFIG)
+
+# Function to prepare a result frame for charting
+def prepare_chart_data(df: pd.DataFrame) -> Tuple[pd.DataFrame, str, List[str], List[str]]:
+    """Detect the recommended chart type, then coerce column types for plotting"""
+    num_columns, cat_columns = split_columns(df)
+    chart_type = detect_chart_type(df, num_columns, cat_columns)
+    
+    # Convert date-like and numeric-like strings
+    df = coerce_types(df)
+    
+    # Get numeric and categorical columns after conversion
+    num_columns, cat_columns = split_columns(df)
+    return df, chart_type, num_columns, cat_columns
+
+# Function to get chart-ready data for a query result or chat entry
+def get_chart_data(entry: Dict[str, Any]) -> Tuple[pd.DataFrame, str, List[str], List[str]]:
+    """Return the coerced frame, chart type and column lists for an entry, computing them once"""
+    if "chart" not in entry:
+        entry["chart"] = prepare_chart_data(results_to_df(entry))
+    return entry["chart"]
+
+# Function to render the recommended chart for a result
+def render_recommended_chart(df: pd.DataFrame, chart_type: str, num_columns: List[str], cat_columns: List[str]) -> None:
+    """Render the chart picked by detect_chart_type using the coerced column lists"""
+    if chart_type == "bar" and cat_columns and num_columns:
+        cat_col = cat_columns[0]
+        num_col = num_columns[0]
+        st.bar_chart(indexed(df, cat_col, num_col))
+        st.caption(f"Bar chart showing {num_col} by {cat_col}")
+    
+    elif chart_type == "line" and num_columns:
+        line_cols = num_columns[:3]  # Limit to first 3 numeric columns
+        st.line_chart(downsample(df[line_cols]))
+        st.caption(f"Line chart showing trends in {', '.join(line_cols)}")
+    
+    elif chart_type == "scatter" and len(num_columns) >= 2:
+        x_col = num_columns[0]
+        y_col = num_columns[1]
+        fig = build_figure(downsample(df[[x_col, y_col]]), "scatter", x_col, y_col)
+        show_figure(fig)
+    
+    elif chart_type == "grouped_bar" and cat_columns and len(num_columns) >= 2:
+        st.write("Multiple numeric values grouped by category")
+        cat_col = cat_columns[0]
+        chart_data = indexed(df, cat_col, num_columns[:3])  # Limit to first 3 numeric columns
+        st.bar_chart(chart_data)
+    
+    elif chart_type == "histogram" and num_columns:
+        num_col = num_columns[0]
+        fig = build_figure(df[[num_col]], "histogram", num_col)
+        show_figure(fig)
+
+# Streamlit fragments (1.37+) let a widget click rerun just that chat entry
+fragment = getattr(st, "fragment", lambda func: func)
+
+# Function to render one SQL answer from the chat history
+@fragment
+def render_sql_answer(chat: Dict[str, Any]) -> None:
+    """Render an assistant answer; its buttons rerun only this entry, not the whole app"""
+    with st.chat_message("assistant"):
+        st.markdown("**SQL Chatbot**:")
         
-        # Create tabs for different visualization options
-        viz_tabs = st.tabs(["Chart Selection", "Custom Chart", "Data Statistics"])
+        # Display explanation if available
+        if "explanation" in chat:
+            st.info(chat["explanation"])
         
-        with viz_tabs[0]:
-            # Recommended chart based on data
-            if chart_type != "none":
-                st.subheader("Recommended Visualization")
-                
-                if chart_type == "bar":
-                    cat_col = cat_columns[0]
-                    num_col = num_columns[0]
-                    st.bar_chart(df.set_index(cat_col)[num_col])
-                    st.caption(f"Bar chart showing {num_col} by {cat_col}")
-                
-                elif chart_type == "line":
-                    # Use the first column as index if it looks like a good candidate
-                    index_col = df.columns[0]
-                    line_cols = num_columns[:3]  # Limit to first 3 numeric columns
-                    st.line_chart(df[line_cols])
-                    st.caption(f"Line chart showing trends in {', '.join(line_cols)}")
-                
-                elif chart_type == "scatter":
-                    st.subheader("Scatter Plot")
-                    x_col = num_columns[0]
-                    y_col = num_columns[1]
-                    fig = {
-                        "data": [{"type": "scatter", "x": df[x_col], "y": df[y_col]}],
-                        "layout": {"title": f"{y_col} vs {x_col}", "xaxis": {"title": x_col}, "yaxis": {"title": y_col}}
-                    }
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                elif chart_type == "grouped_bar":
-                    st.write("Multiple numeric values grouped by category")
-                    cat_col = cat_columns[0]
-                    chart_data = df.set_index(cat_col)[num_columns[:3]]  # Limit to first 3 numeric columns
-                    st.bar_chart(chart_data)
-                
-                elif chart_type == "histogram":
-                    st.subheader("Histogram")
-                    num_col = num_columns[0]
-                    fig = {
-                        "data": [{"type": "histogram", "x": df[num_col]}],
-                        "layout": {"title": f"Distribution of {num_col}"}
-                    }
-                    st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.info("No specific chart type automatically detected for this data")
+        with st.expander("Generated SQL", expanded=False):
+            st.code(chat["sql"], language="sql")
         
-        with viz_tabs[1]:
-            st.subheader("Create Custom Chart")
+        if "df" in chat and not chat["df"].empty:
+            df = chat["df"]
             
-            # Only show options if we have enough data
-            if len(num_columns) > 0:
-                chart_types = ["Bar Chart", "Line Chart", "Scatter Plot", "Pie Chart", "Histogram"]
-                selected_chart = st.selectbox("Select Chart Type", chart_types)
-                
-                if selected_chart == "Bar Chart":
-                    if cat_columns:
-                        x_axis = st.selectbox("Select X-axis (Categories)", cat_columns)
-                        y_axis = st.selectbox("Select Y-axis (Values)", num_columns)
-                        st.bar_chart(df.set_index(x_axis)[y_axis])
-                    else:
-                        st.warning("Bar charts need categorical data for the x-axis")
-                
-                elif selected_chart == "Line Chart":
-                    selected_columns = st.multiselect("Select columns to plot", num_columns, default=num_columns[:2])
-                    if selected_columns:
-                        st.line_chart(df[selected_columns])
-                    else:
-                        st.info("Please select at least one column")
-                
-                elif selected_chart == "Scatter Plot":
-                    if len(num_columns) >= 2:
-                        x_axis = st.selectbox("Select X-axis", num_columns)
-                        y_axis = st.selectbox("Select Y-axis", [col for col in num_columns if col != x_axis], index=0)
-                        fig = {
-                            "data": [{"type": "scatter", "x": df[x_axis], "y": df[y_axis]}],
-                            "layout": {"title": f"{y_axis} vs {x_axis}", "xaxis": {"title": x_axis}, "yaxis": {"title": y_axis}}
-                        }
-                        st.plotly_chart(fig, use_container_width=True)
-                    else:
-                        st.warning("Scatter plots require at least two numeric columns")
-                
-                elif selected_chart == "Pie Chart":
-                    if cat_columns and num_columns:
-                        cat_col = st.selectbox("Select Categories", cat_columns)
-                        val_col = st.selectbox("Select Values", num_columns)
-                        
-                        # Group by category and sum values
-                        pie_data = df.groupby(cat_col)[val_col].sum().reset_index()
-                        
-                        fig = {
-                            "data": [{
-                                "type": "pie",
-                                "labels": pie_data[cat_col],
-                                "values": pie_data[val_col],
-                                "hole": 0.4,
-                            }],
-                            "layout": {"title": f"{val_col} by {cat_col}"}
-                        }
-                        st.plotly_chart(fig, use_container_width=True)
-                    else:
-                        st.warning("Pie charts need both categorical and numeric data")
-                
-                elif selected_chart == "Histogram":
-                    num_col = st.selectbox("Select Numeric Column", num_columns)
-                    bins = st.slider("Number of bins", min_value=5, max_value=50, value=20)
-                    fig = {
-                        "data": [{"type": "histogram", "x": df[num_col], "nbinsx": bins}],
-                        "layout": {"title": f"Distribution of {num_col}"}
-                    }
-                    st.plotly_chart(fig, use_container_width=True)
-            else:
-                st.warning("Not enough numeric data for visualization")
-        
-        with viz_tabs[2]:
-            st.subheader("Data Statistics")
+            # Show data table with expander
+            with st.expander("Data Results", expanded=True):
+                render_table(df, f"chat_{chat['id']}")
             
-            # Show basic statistics for numeric columns
-            if num_columns:
-                st.write("Numeric Columns Statistics")
-                st.dataframe(df[num_columns].describe(), use_container_width=True)
+            # Add a "Show Visualizations" button for each chat response
+            viz_key = f"viz_btn_{chat['id']}"
+            show_viz = False
             
-            # Show value counts for categorical columns (top 10)
-            if cat_columns:
-                st.write("Categorical Columns Value Counts")
-                selected_cat = st.selectbox("Select column", cat_columns)
-                st.dataframe(df[selected_cat].value_counts().head(10).reset_index(), use_container_width=True)
-    else:
-        st.info("No data returned by the query.")
+            if st.button(f"Show Visualizations", key=viz_key):
+                show_viz = True
+            
+            if show_viz and not df.empty:
+                # Detect a chart type and coerce columns for plotting
+                df, chart_type, num_columns, cat_columns = get_chart_data(chat)
+                
+                # Create visualization based on detected type
+                if chart_type != "none" and num_columns:
+                    render_recommended_chart(df, chart_type, num_columns, cat_columns)
+                    
+                    # Show statistics
+                    with st.expander("Data Statistics"):
+                        if num_columns:
+                            st.write("Numeric Statistics")
+                            st.dataframe(df[num_columns].describe())
+                else:
+                    st.info("No suitable visualization detected for this data")
+                
+        elif "error" in chat:
+            st.error(chat["error"])
+        else:
+            st.info("No data returned by the query.")
 
 # Initialize session state for chat history
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
+if "last_submitted" not in st.session_state:
+    st.session_state.last_submitted = None
+    st.session_state.last_result = None
+if "entry_count" not in st.session_state:
+    st.session_state.entry_count = 0
 
 # Main app layout
 st.title("💬 SQL Chatbot")
@@ -287,14 +424,29 @@ with st.sidebar:
     st.header("Database Information")
     
     # Fetch and display table list
-    if st.button("Refresh Database Schema"):
+    refresh = st.button("Refresh Database Schema")
+    if refresh:
+        # Only an explicit refresh bypasses the cached metadata and hits the backend
+        get_database_info.clear()
+    
+    # New sessions load the (usually cached) metadata once; later reruns reuse session state
+    if refresh or "tables" not in st.session_state:
         with st.spinner("Fetching database schema..."):
-            tables_response = query_backend("tables")
+            try:
+                db_info = get_database_info()
+            except Exception as e:
+                db_info = {}
+                st.sidebar.error(f"Backend error details: {type(e).__name__}: {str(e)}")
             
-            if tables_response.get("tables"):
-                st.session_state.tables = tables_response.get("tables", [])
-                st.success(f"Found {len(st.session_state.tables)} tables in the database")
+            if db_info.get("tables"):
+                st.session_state.tables = db_info["tables"]
+                st.session_state.schema = db_info["schema"]
+                if refresh:
+                    st.success(f"Found {len(st.session_state.tables)} tables in the database")
             else:
+                # A failed first load is remembered too, so reruns don't retry until a refresh
+                st.session_state.setdefault("tables", [])
+                st.session_state.setdefault("schema", {})
                 st.error("Could not fetch database tables")
     
     # Display tables if available
@@ -302,126 +454,50 @@ with st.sidebar:
         st.subheader("Database Tables")
         for table in st.session_state.tables:
             with st.expander(table):
-                # Fetch schema for this table when the expander is clicked
-                schema_resp = query_backend("schema", {"table_name": table}, method="POST")
-                if schema_resp.get("schema", {}).get(table):
-                    schema_data = schema_resp["schema"][table]
-                    for col, type_info in schema_data.items():
-                        st.text(f"• {col} ({type_info})")
+                schema_data = st.session_state.schema.get(table)
+                if schema_data:
+                    # One text element per table instead of one per column
+                    st.text("\n".join(f"• {col} ({type_info})" for col, type_info in schema_data.items()))
                 else:
                     st.text("Could not fetch schema")
 
 # Display chat history
 st.subheader("Chat History")
-for i, chat in enumerate(st.session_state.chat_history):
+
+# Older entries are shown as plain text; only the most recent ones get tables and charts
+history = st.session_state.chat_history
+first_full = max(len(history) - FULL_RENDER_ENTRIES, 0)
+if first_full:
+    with st.expander(f"Earlier messages ({first_full})"):
+        for chat in history[:first_full]:
+            if chat["role"] == "user":
+                st.markdown(f"**You**: {chat['content']}")
+            elif "sql" in chat:
+                st.markdown(f"**SQL Chatbot**: {chat.get('explanation', '')}")
+                st.code(chat["sql"], language="sql")
+            else:
+                st.markdown(f"**SQL Chatbot**: {chat['content']}")
+
+for chat in history[first_full:]:
     if chat["role"] == "user":
         st.markdown(f"**You**: {chat['content']}")
     else:
         if "sql" in chat:
-            with st.chat_message("assistant"):
-                st.markdown("**SQL Chatbot**:")
-                
-                # Display explanation if available
-                if "explanation" in chat:
-                    st.info(chat["explanation"])
-                
-                with st.expander("Generated SQL", expanded=False):
-                    st.code(chat["sql"], language="sql")
-                
-                if "data" in chat and chat["data"]:
-                    df = pd.DataFrame(chat["data"])
-                    
-                    # Show data table with expander
-                    with st.expander("Data Results", expanded=True):
-                        st.dataframe(df, use_container_width=True, hide_index=True)
-                        st.caption(f"Found {len(chat['data'])} {'row' if len(chat['data']) == 1 else 'rows'}")
-                    
-                    # Add a "Show Visualizations" button for each chat response
-                    viz_key = f"viz_btn_{i}"
-                    show_viz = False
-                    
-                    if st.button(f"Show Visualizations", key=viz_key):
-                        show_viz = True
-                    
-                    if show_viz and not df.empty:
-                        # Try to detect suitable chart type
-                        chart_type = detect_chart_type(df)
-                        
-                        # Convert any date-like strings to datetime
-                        for col in df.columns:
-                            if df[col].dtype == 'object':
-                                try:
-                                    df[col] = pd.to_datetime(df[col])
-                                except:
-                                    pass
-                        
-                        # Convert numeric columns if stored as strings
-                        for col in df.columns:
-                            if df[col].dtype == 'object':
-                                try:
-                                    df[col] = pd.to_numeric(df[col])
-                                except:
-                                    pass
-                        
-                        # Get numeric and categorical columns after conversion
-                        num_columns = df.select_dtypes(include=['number']).columns.tolist()
-                        cat_columns = df.select_dtypes(include=['object', 'string', 'category']).columns.tolist()
-                        
-                        # Create visualization based on detected type
-                        if chart_type != "none" and num_columns:
-                            if chart_type == "bar" and cat_columns and num_columns:
-                                cat_col = cat_columns[0]
-                                num_col = num_columns[0]
-                                st.bar_chart(df.set_index(cat_col)[num_col])
-                            
-                            elif chart_type == "line" and num_columns:
-                                line_cols = num_columns[:3]  # Limit to first 3 numeric columns
-                                st.line_chart(df[line_cols])
-                            
-                            elif chart_type == "scatter" and len(num_columns) >= 2:
-                                x_col = num_columns[0]
-                                y_col = num_columns[1]
-                                fig = {
-                                    "data": [{"type": "scatter", "x": df[x_col], "y": df[y_col]}],
-                                    "layout": {"title": f"{y_col} vs {x_col}", "xaxis": {"title": x_col}, "yaxis": {"title": y_col}}
-                                }
-                                st.plotly_chart(fig, use_container_width=True)
-                            
-                            elif chart_type == "grouped_bar" and cat_columns and len(num_columns) >= 2:
-                                cat_col = cat_columns[0]
-                                chart_data = df.set_index(cat_col)[num_columns[:3]]
-                                st.bar_chart(chart_data)
-                            
-                            elif chart_type == "histogram" and num_columns:
-                                num_col = num_columns[0]
-                                fig = {
-                                    "data": [{"type": "histogram", "x": df[num_col]}],
-                                    "layout": {"title": f"Distribution of {num_col}"}
-                                }
-                                st.plotly_chart(fig, use_container_width=True)
-                            
-                            # Show statistics
-                            with st.expander("Data Statistics"):
-                                if num_columns:
-                                    st.write("Numeric Statistics")
-                                    st.dataframe(df[num_columns].describe())
-                        else:
-                            st.info("No suitable visualization detected for this data")
-                        
-                elif "error" in chat:
-                    st.error(chat["error"])
-                else:
-                    st.info("No data returned by the query.")
+            render_sql_answer(chat)
         else:
             st.markdown(f"**SQL Chatbot**: {chat['content']}")
 
 # Input area
 st.subheader("Ask a Question")
-user_input = st.text_area("Enter your question in natural language:", 
-                           "Show me the average salary by department", 
-                           height=100)
 
-if st.button("Submit Question"):
+# A form holds back reruns while the question is being edited
+with st.form("query_form"):
+    user_input = st.text_area("Enter your question in natural language:", 
+                               "Show me the average salary by department", 
+                               height=100)
+    submitted = st.form_submit_button("Submit Question")
+
+if submitted:
     if user_input:
         # Add user message to chat history
         st.session_state.chat_history.append({"role": "user", "content": user_input})
@@ -429,20 +505,28 @@ if st.button("Submit Question"):
         # Show loading spinner
         with st.spinner("Generating SQL and fetching results..."):
             try:
-                # Query the backend
-                result = query_backend("query", {"question": user_input}, method="POST")
-                
-                # Log raw response for debugging
-                st.sidebar.write("Raw API Response:", result)
+                # Resubmitting the same question reuses the last answer instead of
+                # running the LLM and the SQL again
+                if user_input == st.session_state.last_submitted:
+                    result = st.session_state.last_result
+                else:
+                    result = query_backend("query", {"question": user_input}, method="POST")
+                    if result.get("success", False):
+                        st.session_state.last_submitted = user_input
+                        st.session_state.last_result = result
                 
                 # Add response to chat history
                 if result.get("success", False):
                     chat_response = {
                         "role": "assistant",
+                        "id": entry_id(user_input, result.get("sql", "")),
                         "sql": result.get("sql", ""),
-                        "data": result.get("data", [])
+                        "df": results_to_df(result)
                     }
                     
+                    # The DataFrame now holds the rows; don't keep the row list around too
+                    result.pop("data", None)
+                    
                     # Add explanation if available
                     if "explanation" in result:
                         chat_response["explanation"] = result["explanation"]
@@ -455,8 +539,8 @@ if st.button("Submit Question"):
                 
                 st.session_state.chat_history.append(chat_response)
             except Exception as e:
+                logger.exception("Error processing query")
                 st.error(f"Error processing query: {str(e)}")
-                st.sidebar.error(f"Exception details: {traceback.format_exc()}")
                 
                 # Add error to chat history
                 chat_response = {
@@ -466,6 +550,8 @@ if st.button("Submit Question"):
                 }
                 st.session_state.chat_history.append(chat_response)
         
+        trim_chat_history()
+        
         # Rerun to update the UI with new chat history
         st.rerun()
     else:
@@ -474,6 +560,8 @@ if st.button("Submit Question"):
 # Clear chat history button
 if st.button("Clear Chat History"):
     st.session_state.chat_history = []
+    st.session_state.last_submitted = None
+    st.session_state.last_result = None
     st.rerun()
 
 # Footer